@@ -0,0 +1,157 @@
+"""
+Covers the cross-invocation coordination: snapshot trust checks, single-flight
+discovery and serialized kills.
+"""
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, "..", "tools"))
+
+import server_slayer_tools as sst
+
+pytestmark = pytest.mark.skipif(sys.platform == "win32", reason="uses Unix locks and signals")
+
+
+def make_server(**overrides):
+    server = {
+        "port": 3000, "pid": 4242, "address": "*", "name": "node", "cmd": "node server.js",
+        "path": "/tmp/app", "type": "Node", "protected": False, "reason": "", "conns": 0
+    }
+    server.update(overrides)
+    return server
+
+
+@pytest.fixture
+def state_dir(tmp_path, monkeypatch):
+    """Points the per-user state directory at a throwaway temp dir."""
+    monkeypatch.setattr(sst.tempfile, "gettempdir", lambda: str(tmp_path))
+    return sst.get_state_dir()
+
+
+def write_snapshot(state_dir, body):
+    with open(os.path.join(state_dir, sst.SCAN_SNAPSHOT), "w", encoding="utf-8") as f:
+        json.dump(body, f)
+
+
+@pytest.mark.parametrize("body", [
+    [make_server()],
+    {"finished_at": "now", "servers": [make_server()]},
+    {"finished_at": True, "servers": [make_server()]},
+    {"finished_at": 1.0, "servers": {"port": 3000}},
+    {"finished_at": 1.0, "servers": [make_server(pid=True)]},
+    {"finished_at": 1.0, "servers": [make_server(pid="4242")]},
+    {"finished_at": 1.0, "servers": [{"port": 3000, "pid": 4242}]},
+])
+def test_malformed_snapshots_are_invalid(body):
+    assert not sst.is_valid_snapshot(body)
+
+
+def test_valid_snapshot_is_reused(state_dir):
+    write_snapshot(state_dir, {"finished_at": time.time(), "servers": [make_server()]})
+
+    assert sst.read_scan_snapshot(0) == [make_server()]
+
+
+@pytest.mark.parametrize("finished_at", [
+    1e12, # Future-dated: would otherwise be reused forever
+    time.time() + sst.SNAPSHOT_CLOCK_SKEW + 60,
+    time.time() - sst.SNAPSHOT_MAX_AGE - 5, # Stale
+])
+def test_future_and_stale_snapshots_are_ignored(state_dir, finished_at):
+    write_snapshot(state_dir, {"finished_at": finished_at, "servers": [make_server()]})
+
+    assert sst.read_scan_snapshot(0) is None
+
+
+def test_untrusted_state_dir_is_refused(state_dir):
+    os.chmod(state_dir, 0o755)
+
+    with pytest.raises(OSError):
+        sst.get_state_dir()
+    assert sst.read_scan_snapshot(0) is None
+
+
+@pytest.fixture
+def counted_scans(state_dir, monkeypatch):
+    """Replaces scan_servers() with a slow fake that records each call."""
+    calls = []
+
+    def fake_scan():
+        calls.append(time.time())
+        time.sleep(0.3)
+        return [make_server(pid=len(calls))]
+
+    monkeypatch.setattr(sst, "scan_servers", fake_scan)
+    return calls
+
+
+def test_sequential_discoveries_each_scan(counted_scans):
+    # The second request starts after the first snapshot finished, so it can't reuse it
+    first = sst.discover_servers()
+    second = sst.discover_servers()
+
+    assert len(counted_scans) == 2
+    assert first[0]["pid"] == 1 and second[0]["pid"] == 2
+
+
+def test_concurrent_discoveries_share_one_scan(counted_scans):
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(sst.discover_servers())) for _ in range(5)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(counted_scans) == 1
+    assert results == [[make_server(pid=1)]] * 5
+
+
+def test_waiter_reuses_snapshot_published_while_it_waited(counted_scans):
+    results = []
+    with sst.file_lock(sst.SCAN_LOCK) as locked:
+        assert locked
+        waiter = threading.Thread(target=lambda: results.append(sst.discover_servers()))
+        waiter.start()
+        time.sleep(0.1) # Waiter has recorded requested_at and is queued on the lock
+        sst.write_scan_snapshot([make_server(pid=99)])
+    waiter.join()
+
+    assert counted_scans == []
+    assert results == [[make_server(pid=99)]]
+
+
+def test_stalled_lock_holder_falls_back_to_own_scan(counted_scans, monkeypatch):
+    monkeypatch.setattr(sst, "SCAN_LOCK_TIMEOUT", 0.2)
+
+    with sst.file_lock(sst.SCAN_LOCK):
+        servers = sst.discover_servers()
+
+    assert len(counted_scans) == 1
+    assert servers == [make_server(pid=1)]
+
+
+def test_slay_dead_pid_is_gone(state_dir):
+    proc = subprocess.Popen(["true"])
+    proc.wait()
+
+    assert sst.slay_processes([proc.pid]) == {proc.pid: "gone"}
+
+
+def test_slay_live_child_is_killed(state_dir):
+    proc = subprocess.Popen(["sleep", "30"])
+    # Reap promptly so the zombie doesn't look alive to wait_for_exit()
+    reaper = threading.Thread(target=proc.wait)
+    reaper.start()
+
+    assert sst.slay_processes([proc.pid, proc.pid]) == {proc.pid: "killed"}
+    reaper.join(timeout=5)
+    assert proc.returncode is not None
+    # Per-PID locks live in one shared file, nothing accumulates per PID
+    assert sorted(os.listdir(state_dir)) == [sst.KILL_LOCK]
@@ -0,0 +1,93 @@
+"""
+Validates the lsof field-mode parser against recorded `lsof -nP -iTCP
+-sTCP:LISTEN,ESTABLISHED -d cwd -F pcnTf` output (see fixtures/).
+"""
+import os
+import sys
+
+import pytest
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, "..", "tools"))
+
+import server_slayer_tools as sst
+
+FIXTURES = os.path.join(HERE, "fixtures")
+
+
+def read_fixture(name):
+    with open(os.path.join(FIXTURES, name), encoding="utf-8") as f:
+        return f.readlines()
+
+
+@pytest.fixture
+def lsof_output(monkeypatch):
+    """Feeds a fixture through stream_command and returns a fresh snapshot."""
+    def load(name):
+        lines = read_fixture(name)
+        monkeypatch.setattr(sst, "stream_command", lambda command: iter(lines))
+        sst.get_lsof_snapshot.cache_clear()
+        return sst.get_lsof_snapshot()
+
+    yield load
+    sst.get_lsof_snapshot.cache_clear()
+
+
+def test_parse_linux_records():
+    records = list(sst.parse_lsof_fields(read_fixture("lsof_linux.txt")))
+
+    assert records[0] == {
+        "pid": 1, "command": "process_api", "fd": "cwd",
+        "name": "/proc/1/cwd (readlink: Permission denied)", "state": ""
+    }
+    dev_server = [r for r in records if r["pid"] == 7260]
+    assert [r["fd"] for r in dev_server] == ["cwd", "3", "4", "5", "6"]
+    assert all(r["command"] == "dev server" for r in dev_server)
+    assert dev_server[0]["name"] == "/tmp/my proj"
+    assert dev_server[1]["name"] == "[::1]:5173"
+    assert [r["state"] for r in dev_server[1:]] == ["LISTEN", "LISTEN", "ESTABLISHED", "ESTABLISHED"]
+
+
+def test_parse_macos_records():
+    records = list(sst.parse_lsof_fields(read_fixture("lsof_macos.txt")))
+
+    by_pid = {}
+    for r in records:
+        by_pid.setdefault(r["pid"], []).append(r)
+    assert by_pid[612][0]["command"] == "Control Center"
+    assert by_pid[48300][0]["command"] == "Google Chrome H"
+    assert by_pid[48211][0]["name"] == "/Users/jane doe/Projects/my app"
+    # TQR/TQS lines must not leak into the state
+    assert {r["state"] for r in records} == {"", "LISTEN", "ESTABLISHED"}
+
+
+def test_linux_snapshot(lsof_output):
+    snapshot = lsof_output("lsof_linux.txt")
+
+    assert snapshot["listening"] == [
+        {"port": 5173, "pid": 7260, "protocol": "TCP", "address": "[::1]"},
+        {"port": 3000, "pid": 7260, "protocol": "TCP", "address": "*"},
+    ]
+    assert snapshot["established"] == {55066: 1, 3000: 1}
+    # Unreadable cwd entries are dropped, paths with spaces survive intact
+    assert 1 not in snapshot["cwd"]
+    assert snapshot["cwd"][2] == "/"
+    assert snapshot["cwd"][7260] == "/tmp/my proj"
+
+
+def test_macos_snapshot(lsof_output):
+    snapshot = lsof_output("lsof_macos.txt")
+
+    assert [(l["port"], l["pid"], l["address"]) for l in snapshot["listening"]] == [
+        (7000, 612, "*"), (3000, 48211, "*"), (5173, 48211, "[::1]")
+    ]
+    assert snapshot["established"] == {3000: 1, 61234: 1, 61240: 1}
+    assert snapshot["cwd"][48211] == "/Users/jane doe/Projects/my app"
+
+
+def test_snapshot_feeds_discovery_helpers(lsof_output, monkeypatch):
+    lsof_output("lsof_macos.txt")
+    monkeypatch.setattr(sst, "SYSTEM_OS", "Darwin")
+
+    assert [p["port"] for p in sst.get_listening_ports()] == [7000, 3000, 5173]
+    assert sst.get_process_path(48211) == "/Users/jane doe/Projects/my app"
@@ -0,0 +1,178 @@
+"""
+Covers the liveness probes: labels against real local servers, kill-proof
+confirmation, and accept-queue parsing from recorded /proc/net/tcp{,6}.
+"""
+import asyncio
+import os
+import socket
+import sys
+import threading
+
+import pytest
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, "..", "tools"))
+
+import server_slayer_tools as sst
+
+FIXTURES = os.path.join(HERE, "fixtures")
+HAS_PROC_NET = os.path.exists("/proc/net/tcp")
+
+LABEL_TIMEOUT = 0.5
+CONFIRM_TIMEOUT = 1.5
+
+
+def make_server(port, type_="Python", protected=False):
+    return {"port": port, "pid": 1, "address": "127.0.0.1", "type": type_, "protected": protected}
+
+
+@pytest.fixture(scope="module")
+def loop():
+    """An event loop in a background thread, hosting the servers under test."""
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    yield loop
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join()
+
+
+@pytest.fixture(scope="module")
+def start_server(loop):
+    """Starts an asyncio server running `handler` on a free port; returns the port."""
+    servers = []
+
+    def start(handler):
+        server = asyncio.run_coroutine_threadsafe(
+            asyncio.start_server(handler, "127.0.0.1", 0), loop
+        ).result()
+        servers.append(server)
+        return server.sockets[0].getsockname()[1]
+
+    yield start
+    for server in servers:
+        loop.call_soon_threadsafe(server.close)
+
+
+def answering(delay=0.0):
+    async def handler(reader, writer):
+        await reader.readuntil(b"\r\n\r\n")
+        await asyncio.sleep(delay)
+        writer.write(b"HTTP/1.0 200 OK\r\n\r\n")
+        await writer.drain()
+        writer.close()
+    return handler
+
+
+async def silent(reader, writer):
+    # Accepts, then waits for the client to speak its own protocol first
+    await reader.read()
+    writer.close()
+
+
+async def closing(reader, writer):
+    writer.close()
+
+
+def refused_port():
+    s = socket.socket()
+    s.bind(("127.0.0.1", 0))
+    port = s.getsockname()[1]
+    s.close()
+    return port
+
+
+@pytest.fixture
+def never_accepting():
+    """A listener whose accept() is never called, like a wedged event loop."""
+    s = socket.socket()
+    s.bind(("127.0.0.1", 0))
+    s.listen(5)
+    yield s.getsockname()[1]
+    s.close()
+
+
+def test_probe_labels(start_server):
+    servers = [
+        make_server(start_server(answering())),
+        make_server(start_server(answering(delay=0.35))),
+        make_server(start_server(silent)),
+        make_server(refused_port()),
+        make_server(start_server(closing)),
+        make_server(start_server(silent), type_="Unknown"),
+        make_server(start_server(answering()), protected=True),
+    ]
+
+    sst.probe_servers(servers, LABEL_TIMEOUT)
+
+    assert [s["health"] for s in servers] == [
+        "Responsive", "Slow", "Unresponsive", "Unresponsive", "Responsive", "Responsive", "-"
+    ]
+    assert [s.get("probe_outcome") for s in servers] == [
+        "answered", "answered", "silent", "refused", "answered", "answered", None
+    ]
+    assert servers[0]["latency_ms"] is not None
+    assert servers[2]["latency_ms"] is None
+
+
+def test_probe_inside_running_event_loop(start_server):
+    servers = [make_server(start_server(answering()))]
+
+    async def agent_runtime():
+        sst.probe_servers(servers, LABEL_TIMEOUT)
+
+    asyncio.run(agent_runtime())
+    assert servers[0]["health"] == "Responsive"
+
+
+def test_slow_server_is_not_kill_proof(start_server):
+    servers = [make_server(start_server(answering(delay=0.8)))]
+
+    sst.probe_servers(servers, LABEL_TIMEOUT)
+    assert servers[0]["health"] == "Unresponsive"
+
+    sst.confirm_unresponsive(servers, CONFIRM_TIMEOUT)
+    assert servers[0]["health"] == "Slow"
+    assert servers[0]["kill_proof"] is False
+
+
+def test_refused_port_is_kill_proof_without_confirmation(monkeypatch):
+    servers = [make_server(refused_port())]
+    sst.probe_servers(servers, LABEL_TIMEOUT)
+    monkeypatch.setattr(sst, "confirm_all", None) # Must not be reached
+
+    sst.confirm_unresponsive(servers, CONFIRM_TIMEOUT)
+    assert servers[0]["kill_proof"] is True
+
+
+@pytest.mark.skipif(not HAS_PROC_NET, reason="needs /proc/net/tcp accept queues")
+def test_silent_accepting_server_is_not_kill_proof(start_server):
+    servers = [make_server(start_server(silent))]
+
+    sst.probe_servers(servers, LABEL_TIMEOUT)
+    sst.confirm_unresponsive(servers, CONFIRM_TIMEOUT)
+
+    assert servers[0]["health"] == "Unresponsive"
+    assert servers[0]["kill_proof"] is False
+
+
+@pytest.mark.skipif(not HAS_PROC_NET, reason="needs /proc/net/tcp accept queues")
+def test_never_accepting_server_is_kill_proof(never_accepting):
+    servers = [make_server(never_accepting)]
+
+    sst.probe_servers(servers, LABEL_TIMEOUT)
+    sst.confirm_unresponsive(servers, CONFIRM_TIMEOUT)
+
+    assert servers[0]["health"] == "Unresponsive"
+    assert servers[0]["kill_proof"] is True
+
+
+def test_listen_queue_depths_from_fixtures():
+    tables = [os.path.join(FIXTURES, "proc_net_tcp.txt"), os.path.join(FIXTURES, "proc_net_tcp6.txt")]
+
+    # 38250 has three connections waiting in its accept queue; ESTABLISHED rows are ignored
+    assert sst.get_listen_queue_depths(tables) == {38250: 3, 38251: 0, 38252: 1}
+
+
+def test_listen_queue_depths_without_proc():
+    assert sst.get_listen_queue_depths([os.path.join(FIXTURES, "missing.txt")]) == {}
@@ -4,7 +4,14 @@ import platform
 import json
 import re
 import sys
-from typing import List, Dict, Optional, Any
+import stat
+import time
+import asyncio
+import getpass
+import tempfile
+from functools import lru_cache
+from contextlib import contextmanager
+from typing import List, Dict, Optional, Any, Iterable, Iterator
 
 # Initial Knowledge Base (in a real agent, this might be loaded from a file or config)
 KNOWLEDGE_BASE = {
@@ -36,9 +43,105 @@ def run_command(command: List[str]) -> str:
     except Exception as e:
         return ""
 
+def stream_command(command: List[str]) -> Iterator[str]:
+    """Executes a system command and yields stdout line by line as it is produced."""
+    try:
+        proc = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+    except Exception:
+        return
+    with proc:
+        yield from proc.stdout
+
+# lsof field mode (macOS / Linux without psutil)
+# One invocation covers listeners, established sockets and every process CWD.
+# Selections are ORed, so -d cwd adds cwd entries alongside the TCP sockets.
+LSOF_COMMAND = ["lsof", "-nP", "-iTCP", "-sTCP:LISTEN,ESTABLISHED", "-d", "cwd", "-F", "pcnTf"]
+
+def parse_lsof_fields(lines: Iterable[str]) -> Iterator[Dict[str, Any]]:
+    """
+    Parses `lsof -F pcnTf` output as it streams in, one record per open file:
+    {'pid': int, 'command': str, 'fd': str, 'name': str, 'state': str}
+    Each line is a one-letter field tag followed by its value; 'p' starts a
+    process set and 'f' starts a file within it. Unknown tags are ignored.
+    """
+    pid = None
+    command = ""
+    current = None
+
+    for raw in lines:
+        line = raw.rstrip("\r\n")
+        if not line:
+            continue
+        tag, value = line[0], line[1:]
+
+        if tag == "p":
+            if current:
+                yield current
+            current = None
+            pid = int(value) if value.isdigit() else None
+            command = ""
+        elif tag == "c":
+            command = value
+        elif tag == "f":
+            if current:
+                yield current
+            current = None
+            if pid is not None:
+                current = {"pid": pid, "command": command, "fd": value, "name": "", "state": ""}
+        elif current is None:
+            continue
+        elif tag == "n":
+            current["name"] = value
+        elif tag == "T" and value.startswith("ST="):
+            current["state"] = value[3:] # TST=LISTEN
+
+    if current:
+        yield current
+
+def split_lsof_address(name: str) -> tuple[str, Optional[int]]:
+    """Splits the local side of an lsof name ('*:3000', '[::1]:3000->[::1]:5000') into (address, port)."""
+    local = name.split("->")[0]
+    if ":" not in local:
+        return local, None
+    address, port_str = local.rsplit(":", 1)
+    return address, int(port_str) if port_str.isdigit() else None
+
+@lru_cache(maxsize=1)
+def get_lsof_snapshot() -> Dict[str, Any]:
+    """
+    Runs LSOF_COMMAND once and returns
+    {'listening': [...], 'established': {port: count}, 'cwd': {pid: path}}.
+    Cached so one discovery pass shares a single lsof call; scan_servers() clears it.
+    """
+    listening = []
+    established = {}
+    cwd = {}
+
+    for record in parse_lsof_fields(stream_command(LSOF_COMMAND)):
+        if record["fd"] == "cwd":
+            # Unreadable entries come back as "/proc/1/cwd (readlink: Permission denied)"
+            if record["name"] and "(readlink:" not in record["name"]:
+                cwd[record["pid"]] = record["name"]
+            continue
+
+        address, port = split_lsof_address(record["name"])
+        if port is None:
+            continue
+        if record["state"] == "LISTEN":
+            listening.append({
+                "port": port,
+                "pid": record["pid"],
+                "protocol": "TCP",
+                "address": address
+            })
+        elif record["state"] == "ESTABLISHED":
+            established[port] = established.get(port, 0) + 1
+
+    return {"listening": listening, "established": established, "cwd": cwd}
+
 def get_listening_ports() -> List[Dict[str, Any]]:
     """
-    Returns a list of dicts: {'port': int, 'pid': int, 'protocol': str}
+    Returns a list of dicts: {'port': int, 'pid': int, 'protocol': str, 'address': str}
     """
     ports = []
     
@@ -60,32 +163,13 @@ def get_listening_ports() -> List[Dict[str, Any]]:
                             ports.append({
                                 "port": int(port_str),
                                 "pid": int(pid),
-                                "protocol": protocol
+                                "protocol": protocol,
+                                "address": local_addr.rsplit(":", 1)[0]
                             })
                             
     else: # macOS / Linux
-        # lsof -iTCP -sTCP:LISTEN -n -P
-        output = run_command(["lsof", "-iTCP", "-sTCP:LISTEN", "-n", "-P"])
-        # Format: COMMAND PID USER FD TYPE DEVICE SIZE/OFF NODE NAME
-        for line in output.splitlines()[1:]: # Skip header
-            parts = line.split()
-            if len(parts) >= 9:
-                pid = parts[1]
-                proto = parts[4] # usually IPv4/IPv6
-                
-                # Address is likely parts[8] on Linux or parts[8] on macOS variants
-                # Actually, standard lsof outputs Name at the end: *:3000 (LISTEN)
-                name_field = parts[8]
-                if ":" in name_field:
-                    port_str = name_field.split(":")[-1].split("(")[0] # Handle "(LISTEN)" if attached
-                    if "->" in port_str: # handle established if leaky logic
-                        continue
-                    if port_str.isdigit():
-                         ports.append({
-                            "port": int(port_str),
-                            "pid": int(pid),
-                            "protocol": "TCP"
-                        })
+        # Shared single lsof -F call (see get_lsof_snapshot)
+        ports.extend(get_lsof_snapshot()["listening"])
 
     return ports
 
@@ -147,21 +231,12 @@ def get_process_path(pid: int) -> str:
             # But sometimes ExecutablePath is what we want if it is a built exe?
             pass
         else:
-            # Try pwdx first (Linux)
-            pwdx_out = run_command(["pwdx", str(pid)])
-            if pwdx_out and ":" in pwdx_out:
-                # 1234: /path/to/cwd
-                path = pwdx_out.split(":", 1)[1].strip()
+            # CWDs come from the shared lsof call, no per-process lookups
+            path = get_lsof_snapshot()["cwd"].get(pid, "")
             
-            # If failed, try lsof for cwd (macOS/Linux)
-            if not path:
-                # lsof -p <pid> -d cwd -F n
-                lsof_out = run_command(["lsof", "-p", str(pid), "-d", "cwd", "-F", "n"])
-                if lsof_out:
-                    for line in lsof_out.splitlines():
-                        if line.startswith("n"):
-                            path = line[1:].strip()
-                            break
+            # If lsof missed it, read /proc directly (Linux)
+            if not path and os.path.isdir(f"/proc/{pid}"):
+                path = os.readlink(f"/proc/{pid}/cwd")
     except Exception:
         pass
         
@@ -203,23 +278,8 @@ def get_established_connections() -> Dict[int, int]:
                             port = int(port_str)
                             counts[port] = counts.get(port, 0) + 1
     else:
-        # lsof -iTCP -sTCP:ESTABLISHED -n -P
-        output = run_command(["lsof", "-iTCP", "-sTCP:ESTABLISHED", "-n", "-P"])
-        # Same parsing as listening, but counting
-        for line in output.splitlines()[1:]:
-            parts = line.split()
-            if len(parts) >= 9:
-                name_field = parts[8] # *:3000->*:54321
-                if "->" in name_field:
-                    # connection, usually 'Local->Remote' or 'Remote->Local' (depends on lsof ver)
-                    # We want the LOCAL port.
-                    # lsof -n -P output: 192.168.1.5:3000->1.2.3.4:443
-                    base = name_field.split("->")[0]
-                    if ":" in base:
-                        port_str = base.split(":")[-1]
-                        if port_str.isdigit():
-                            port = int(port_str)
-                            counts[port] = counts.get(port, 0) + 1
+        # Same lsof call as listening; local side of 192.168.1.5:3000->1.2.3.4:443
+        counts.update(get_lsof_snapshot()["established"])
 
     return counts
 
@@ -275,64 +335,571 @@ def kill_process(pid: int, force: bool = False) -> bool:
     except subprocess.CalledProcessError:
         return False
 
-# Agent Tool Wrapper
-def server_slayer_tool(action: str, scope: str = "project", idle_only: bool = False, 
-                      force: bool = False, specific_port: Optional[int] = None):
+# Liveness Probing
+# A wedged server with a full accept backlog still shows up as LISTEN with
+# zero ESTABLISHED connections, so it looks idle/healthy. These probes actually
+# talk to each listener, all at once, so the whole stage costs ~one timeout.
+# The tight PROBE_TIMEOUT only drives the labels; before --unresponsive-only
+# kills anything it needs harder evidence (see confirm_unresponsive).
+PROBE_TIMEOUT = 1.0 # seconds, labelling budget per listener (probes run concurrently)
+CONFIRM_TIMEOUT = 10.0 # seconds, second probe of kill candidates without hard evidence
+TCP_LISTEN_STATE = "0A" # st column in /proc/net/tcp
+PROC_NET_TCP = ("/proc/net/tcp", "/proc/net/tcp6")
+
+def get_listen_queue_depths(tables: Iterable[str] = PROC_NET_TCP) -> Dict[int, int]:
     """
-    Main entry point for the agent tool.
-    actions: 'detect', 'list', 'kill'
+    Returns a dict mapping Port -> connections waiting in the accept queue.
+    On LISTEN sockets /proc/net/tcp reports the accept queue as rx_queue.
+    Only available on Linux; empty elsewhere.
+    """
+    depths = {}
+    for table in tables:
+        try:
+            with open(table, encoding="ascii") as f:
+                lines = f.read().splitlines()[1:] # Skip header
+        except OSError:
+            continue
+
+        for line in lines:
+            # sl local_address rem_address st tx_queue:rx_queue ...
+            parts = line.split()
+            if len(parts) < 5 or parts[3] != TCP_LISTEN_STATE:
+                continue
+            try:
+                port = int(parts[1].rsplit(":", 1)[1], 16)
+                rx_queue = int(parts[4].split(":")[1], 16)
+            except (IndexError, ValueError):
+                continue
+            depths[port] = max(depths.get(port, 0), rx_queue)
+
+    return depths
+
+def get_probe_host(address: str) -> str:
+    """Maps a listener's bind address to something we can connect to locally."""
+    address = address.strip("[]")
+    if address in ("", "*", "0.0.0.0"):
+        return "127.0.0.1"
+    if address == "::":
+        return "::1"
+    return address
+
+async def probe_server(host: str, port: int, http: bool, timeout: float,
+                       release: Optional[asyncio.Event] = None) -> tuple[str, Optional[float]]:
+    """
+    TCP connect, plus an HTTP HEAD for web frameworks, all within `timeout`.
+    Returns (outcome, latency_seconds); latency is None unless answered. Outcomes:
+      'answered'        connected, and for the HEAD got any bytes, a close or a reset
+      'silent'          connected, but the HEAD got nothing back in time
+      'refused'         connect failed
+      'connect_timeout' connect never completed (e.g. a full accept queue dropping our SYN)
+    If `release` is given, a silent connection is held open until it is set, so the
+    caller can check whether the server ever accepted it.
+    """
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    try:
+        reader, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout)
+    except asyncio.TimeoutError:
+        return "connect_timeout", None
+    except OSError:
+        return "refused", None
+
+    async def head():
+        writer.write(f"HEAD / HTTP/1.0\r\nHost: localhost:{port}\r\n\r\n".encode("ascii"))
+        await writer.drain()
+        # Returns as soon as anything arrives; b"" means an orderly close
+        await reader.read(64)
+
+    outcome = "answered"
+    try:
+        if http:
+            await asyncio.wait_for(head(), max(start + timeout - loop.time(), 0))
+    except asyncio.TimeoutError:
+        outcome = "silent"
+    except OSError:
+        # Reset after a successful connect: the process is alive and rejected us
+        pass
+    latency = loop.time() - start if outcome == "answered" else None
+
+    try:
+        if outcome == "silent" and release is not None:
+            await release.wait()
+    finally:
+        writer.close()
+    return outcome, latency
+
+def probe_args(server: Dict[str, Any]) -> tuple[str, int, bool]:
+    """(host, port, http) for probing a discovered server."""
+    return get_probe_host(server.get("address", "")), server["port"], server["type"] != "Unknown"
+
+async def probe_all(servers: List[Dict[str, Any]], timeout: float) -> List[tuple[str, Optional[float]]]:
+    """Probes every server concurrently, each bounded by `timeout`."""
+    return await asyncio.gather(*(probe_server(*probe_args(s), timeout) for s in servers))
+
+async def confirm_all(servers: List[Dict[str, Any]], timeout: float):
+    """
+    Re-probes `servers` concurrently with the longer `timeout`. Silent connections are
+    held open until every probe has had its full budget, then the accept queues are
+    read, so a server that never accepted our connection shows a non-zero rx_queue.
+    Returns (outcomes, depths).
+    """
+    release = asyncio.Event()
+    tasks = [asyncio.ensure_future(probe_server(*probe_args(s), timeout, release)) for s in servers]
+    await asyncio.wait(tasks, timeout=timeout)
+    depths = get_listen_queue_depths()
+    release.set()
+    return await asyncio.gather(*tasks), depths
+
+def run_probes(make_coro):
+    """
+    Runs a probe coroutine to completion and returns its result. server_slayer_tool()
+    is also called in-process by agent runtimes that may already be inside an event
+    loop; there asyncio.run() would raise, so the probes get their own loop in a
+    worker thread (the caller blocks until they finish, like every other stage).
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(make_coro())
+
+    from concurrent.futures import ThreadPoolExecutor
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        return pool.submit(lambda: asyncio.run(make_coro())).result()
+
+def probe_servers(servers: List[Dict[str, Any]], timeout: float = PROBE_TIMEOUT):
+    """
+    Labels each unprotected server in place with 'health' (Responsive/Slow/Unresponsive),
+    'probe_outcome', 'latency_ms' and 'backlog' (accept queue depth, where the OS exposes it).
+    """
+    # Read queues before probing, otherwise our own probe connections show up in them
+    depths = get_listen_queue_depths()
+    live = [s for s in servers if not s["protected"]]
+    outcomes = run_probes(lambda: probe_all(live, timeout)) if live else []
+
+    for server, (outcome, latency) in zip(live, outcomes):
+        queued = depths.get(server["port"], 0)
+        server["backlog"] = queued if server["port"] in depths else "-"
+        server["probe_outcome"] = outcome
+        server["latency_ms"] = round(latency * 1000) if latency is not None else None
+
+        if outcome != "answered":
+            server["health"] = "Unresponsive"
+        elif queued > 0 or latency > timeout / 2:
+            # Connections piling up unaccepted, or just sluggish
+            server["health"] = "Slow"
+        else:
+            server["health"] = "Responsive"
+
+    for server in servers:
+        server.setdefault("health", "-")
+
+def confirm_unresponsive(servers: List[Dict[str, Any]], timeout: float = CONFIRM_TIMEOUT):
+    """
+    Decides which Unresponsive servers are safe to kill, setting 'kill_proof' in place.
+    Hard evidence from the labelling probe is enough: a failed connect, or connections
+    already queued unaccepted before we probed. Anything else (typically a HEAD that
+    timed out: a dev server compiling its first page, or a client-first protocol)
+    gets one longer confirmation probe. It is only proof if that also fails to connect
+    or get an answer, and - where /proc exposes accept queues - the server never even
+    accepted the connection. Without queue info a silence of `timeout` is proof.
+    """
+    suspects = []
+    for server in servers:
+        if server.get("health") != "Unresponsive":
+            server["kill_proof"] = False
+        elif server.get("probe_outcome") in ("refused", "connect_timeout") or \
+                (isinstance(server.get("backlog"), int) and server["backlog"] > 0):
+            server["kill_proof"] = True
+        else:
+            suspects.append(server)
+
+    if not suspects:
+        return
+    outcomes, depths = run_probes(lambda: confirm_all(suspects, timeout))
+
+    for server, (outcome, latency) in zip(suspects, outcomes):
+        if outcome == "answered":
+            # Just slow, e.g. still compiling
+            server["health"] = "Slow"
+            server["latency_ms"] = round(latency * 1000)
+            server["kill_proof"] = False
+        elif outcome == "silent" and server["port"] in depths:
+            # Accepted but never spoke: alive. Still queued: wedged.
+            server["kill_proof"] = depths[server["port"]] > 0
+        else:
+            server["kill_proof"] = True
+
+# Cross-invocation coordination
+# Several agent sessions / IDE windows often fire /listports or /killservers at
+# the same moment. They share a per-user state directory so that concurrent
+# scans coalesce into one discovery and kills of the same PID are serialized.
+SCAN_LOCK = "scan.lock"
+KILL_LOCK = "kill.lock" # One file; each PID locks the byte at offset PID
+KILL_GRACE_PERIOD = 2.0 # seconds, shared by all targets of one kill run
+SCAN_LOCK_TIMEOUT = 10.0 # seconds to wait for another run's scan before scanning ourselves
+LOCK_POLL_INTERVAL = 0.05
+SCAN_SNAPSHOT = "scan.json"
+SNAPSHOT_MAX_AGE = 30.0 # seconds; older snapshots are never reused
+SNAPSHOT_CLOCK_SKEW = 1.0 # seconds a snapshot may appear to come from the future
+
+# Field -> expected type(s) for every server entry in a snapshot
+SNAPSHOT_FIELDS = {
+    "port": int, "pid": int, "address": str, "name": str, "cmd": str, "path": str,
+    "type": str, "protected": bool, "reason": str, "conns": int
+}
+
+def get_state_dir() -> str:
+    """
+    Returns (and creates) the per-user directory holding locks and the shared scan snapshot.
+    The snapshot decides which PIDs get killed, so on Unix the directory must be a real
+    directory owned by us with mode 0700; anything else raises OSError and callers
+    fall back to running uncoordinated.
+    """
+    try:
+        user = getpass.getuser()
+    except Exception:
+        user = str(os.getuid()) if hasattr(os, "getuid") else "default"
+    path = os.path.join(tempfile.gettempdir(), f"serverslayer-{user}")
+    os.makedirs(path, mode=0o700, exist_ok=True)
+
+    if hasattr(os, "getuid"):
+        st = os.lstat(path)
+        if not stat.S_ISDIR(st.st_mode) or st.st_uid != os.getuid() or stat.S_IMODE(st.st_mode) != 0o700:
+            raise OSError(f"refusing to use untrusted state directory {path}")
+    return path
+
+def is_valid_snapshot(data: Any) -> bool:
+    """Checks that a loaded snapshot has the shape write_scan_snapshot() produces."""
+    if not isinstance(data, dict):
+        return False
+    finished_at = data.get("finished_at")
+    if isinstance(finished_at, bool) or not isinstance(finished_at, (int, float)):
+        return False
+    servers = data.get("servers")
+    if not isinstance(servers, list):
+        return False
+    for server in servers:
+        if not isinstance(server, dict):
+            return False
+        for field, expected in SNAPSHOT_FIELDS.items():
+            value = server.get(field)
+            # bool is an int subclass, don't let True pass as a PID
+            if not isinstance(value, expected) or (expected is int and isinstance(value, bool)):
+                return False
+    return True
+
+def lock_byte(fd: int, offset: int, timeout: Optional[float] = None) -> bool:
+    """
+    Polls for an exclusive lock on one byte of `fd` (Windows).
+    Returns False if `timeout` seconds pass first; None waits forever.
+    """
+    import msvcrt
+    deadline = None if timeout is None else time.monotonic() + timeout
+    while True:
+        try:
+            os.lseek(fd, offset, os.SEEK_SET)
+            msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+            return True
+        except OSError:
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(LOCK_POLL_INTERVAL)
+
+def flock_exclusive(fd: int, timeout: Optional[float] = None) -> bool:
+    """
+    Polls for an exclusive flock on `fd` (Unix).
+    Returns False if `timeout` seconds pass first; None waits forever.
+    """
+    import fcntl
+    if timeout is None:
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        return True
+
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return True
+        except BlockingIOError:
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(LOCK_POLL_INTERVAL)
+
+def unlock_byte(fd: int, offset: int):
+    """Releases a lock taken with lock_byte()."""
+    import msvcrt
+    try:
+        os.lseek(fd, offset, os.SEEK_SET)
+        msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+    except OSError:
+        pass
+
+@contextmanager
+def file_lock(name: str, timeout: Optional[float] = None):
+    """
+    Holds an exclusive lock on <state_dir>/<name> for the duration of the block and
+    yields whether we actually got it. The OS drops the lock if the holder dies, so a
+    crashed run never wedges the others; `timeout` bounds the wait for a stalled one.
+    If the state directory is unusable or the wait times out, we yield False and the
+    caller runs uncoordinated rather than fail.
     """
+    try:
+        fd = os.open(os.path.join(get_state_dir(), name), os.O_RDWR | os.O_CREAT, 0o600)
+    except OSError:
+        yield False
+        return
+
+    locked = False
+    try:
+        if SYSTEM_OS == "Windows":
+            locked = lock_byte(fd, 0, timeout)
+        else:
+            locked = flock_exclusive(fd, timeout)
+        yield locked
+    finally:
+        if SYSTEM_OS == "Windows" and locked:
+            unlock_byte(fd, 0)
+        os.close(fd) # Closing the descriptor releases flock on Unix
+
+@contextmanager
+def pid_locks(pids: List[int]):
+    """
+    Holds a per-PID lock for every PID in `pids`, as one-byte ranges of the single
+    KILL_LOCK file, so no lock file is left behind per PID. Ranges are taken in
+    ascending PID order, so runs locking overlapping sets can't deadlock.
+    On Unix these are POSIX record locks: they exclude other processes, not threads.
+    Yields False (uncoordinated) if the state directory is unusable.
+    """
+    try:
+        fd = os.open(os.path.join(get_state_dir(), KILL_LOCK), os.O_RDWR | os.O_CREAT, 0o600)
+    except OSError:
+        yield False
+        return
+
+    locked = []
+    try:
+        for pid in sorted(set(pids)):
+            if SYSTEM_OS == "Windows":
+                lock_byte(fd, pid)
+            else:
+                import fcntl
+                fcntl.lockf(fd, fcntl.LOCK_EX, 1, pid)
+            locked.append(pid)
+        yield True
+    finally:
+        if SYSTEM_OS == "Windows":
+            for pid in locked:
+                unlock_byte(fd, pid)
+        os.close(fd) # Releases every record lock we hold on the file
+
+def read_scan_snapshot(not_before: float) -> Optional[List[Dict[str, Any]]]:
+    """
+    Returns the shared scan snapshot if it finished at or after `not_before`, else None.
+    Malformed, future-dated or stale (> SNAPSHOT_MAX_AGE) snapshots are ignored.
+    """
+    try:
+        with open(os.path.join(get_state_dir(), SCAN_SNAPSHOT), encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    if not is_valid_snapshot(data):
+        return None
+
+    now = time.time()
+    finished_at = data["finished_at"]
+    if finished_at < not_before or finished_at > now + SNAPSHOT_CLOCK_SKEW:
+        return None
+    if now - finished_at > SNAPSHOT_MAX_AGE:
+        return None
+    return data["servers"]
+
+def write_scan_snapshot(servers: List[Dict[str, Any]]):
+    """Atomically publishes a scan snapshot for concurrent waiters."""
+    tmp_path = None
+    try:
+        path = os.path.join(get_state_dir(), SCAN_SNAPSHOT)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            os.unlink(tmp_path) # Leftover from a crashed run that had our PID
+        except FileNotFoundError:
+            pass
+        flags = os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, "O_NOFOLLOW", 0)
+        fd = os.open(tmp_path, flags, 0o600)
+        with open(fd, "w", encoding="utf-8") as f:
+            json.dump({"finished_at": time.time(), "servers": servers}, f)
+        os.replace(tmp_path, path)
+    except OSError:
+        if tmp_path:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+
+def is_process_alive(pid: int) -> bool:
+    """Checks whether a PID still exists."""
+    try:
+        import psutil
+        return psutil.pid_exists(pid)
+    except ImportError:
+        pass
+
+    if SYSTEM_OS == "Windows":
+        output = run_command(["tasklist", "/FI", f"PID eq {pid}", "/FO", "CSV", "/NH"])
+        return f'"{pid}"' in output
+
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        # Exists, just owned by someone else
+        return True
+    return True
+
+def scan_servers() -> List[Dict[str, Any]]:
+    """
+    Runs one full discovery pass over listening ports.
+    Scope is NOT resolved here because it depends on the caller's CWD.
+    """
+    # Each pass starts from a fresh lsof view (no-op on Windows / with psutil)
+    get_lsof_snapshot.cache_clear()
     
-    # 1. Discovery
     listening = get_listening_ports()
     # Cache established connections once if idle check is needed or for reporting
-    conn_counts = get_established_connections() 
-    
-    current_cwd = os.getcwd().lower()
-    
-    targets = []
-    results = [] # Detailed report
-    
+    conn_counts = get_established_connections()
+
+    servers = []
     for l in listening:
         pid = l['pid']
         port = l['port']
-        
+
         info = get_process_info(pid)
         protected, reason = is_protected(info, port)
         classification = classify_server(info, port)
-        
-        # Extended Checks
-        path = ""
-        scope_status = "Unknown"
-        
+
         # only check path if we care about scope or just want to report it
-        # It's expensive, so maybe strictly do it?
-        # For this tool, we'll do it to be robust
-        if not protected:
-             path = get_process_path(pid)
-             if path:
-                 path_lower = path.lower()
-                 if path_lower.startswith(current_cwd):
-                     scope_status = "Project"
-                 elif "system32" in path_lower or "/usr/bin" in path_lower or "/sbin" in path_lower: # Heuristic
-                     scope_status = "System"
-                 else:
-                     scope_status = "External"
-        
-        conns = conn_counts.get(port, 0)
-        
-        entry = {
+        # It's expensive, so we skip it for protected processes
+        path = get_process_path(pid) if not protected else ""
+
+        servers.append({
             "port": port,
             "pid": pid,
+            "address": l.get("address", ""),
             "name": info["name"],
             "cmd": info["cmdline"],
             "path": path,
             "type": classification,
             "protected": protected,
             "reason": reason,
-            "scope": scope_status,
-            "conns": conns
-        }
+            "conns": conn_counts.get(port, 0)
+        })
+
+    return servers
+
+def discover_servers() -> List[Dict[str, Any]]:
+    """
+    Single-flight wrapper around scan_servers().
+    Concurrent callers queue on a per-user lock. The first one in scans and
+    publishes a snapshot; everyone who was already waiting reuses it instead
+    of scanning again, so N simultaneous callers cost roughly one scan.
+    If the lock holder stalls (e.g. lsof hanging on a dead network mount) for
+    longer than SCAN_LOCK_TIMEOUT, we scan on our own instead of queueing behind it.
+    """
+    requested_at = time.time()
+    with file_lock(SCAN_LOCK, timeout=SCAN_LOCK_TIMEOUT) as locked:
+        if not locked:
+            return scan_servers()
+
+        servers = read_scan_snapshot(requested_at)
+        if servers is None:
+            servers = scan_servers()
+            write_scan_snapshot(servers)
+    return servers
+
+def wait_for_exit(pids: List[int], timeout: float = KILL_GRACE_PERIOD) -> bool:
+    """Polls until every PID disappears or `timeout` elapses. Returns True if all exited."""
+    deadline = time.monotonic() + timeout
+    remaining = set(pids)
+    while remaining:
+        remaining = {pid for pid in remaining if is_process_alive(pid)}
+        if not remaining or time.monotonic() >= deadline:
+            break
+        time.sleep(0.1)
+    return not remaining
+
+def slay_processes(pids: List[int], force: bool = False) -> Dict[int, str]:
+    """
+    Kills processes while holding their per-PID locks, so racing invocations don't
+    report spurious failures for a PID another run just killed.
+    Every target is signalled first, then all of them share one KILL_GRACE_PERIOD
+    to shut down before the locks are released; so the next waiter sees them as
+    gone, and a kill run adds at most ~2s in total, not per server.
+    Returns a dict mapping PID -> 'killed', 'gone' (already dead) or 'failed'.
+    """
+    outcomes = {}
+    with pid_locks(pids):
+        for pid in sorted(set(pids)):
+            if not is_process_alive(pid):
+                outcomes[pid] = "gone"
+            elif kill_process(pid, force):
+                outcomes[pid] = "killed"
+            else:
+                outcomes[pid] = "failed" if is_process_alive(pid) else "gone"
+
+        wait_for_exit([pid for pid, outcome in outcomes.items() if outcome == "killed"])
+    return outcomes
+
+# Agent Tool Wrapper
+def server_slayer_tool(action: str, scope: str = "project", idle_only: bool = False, 
+                      force: bool = False, specific_port: Optional[int] = None,
+                      probe: bool = False, unresponsive_only: bool = False,
+                      probe_timeout: float = PROBE_TIMEOUT):
+    """
+    Main entry point for the agent tool.
+    actions: 'detect', 'list', 'kill'
+    probe: run liveness probes and report each server's health.
+    unresponsive_only: only kill servers that fail the probe (implies probe) and
+        then fail a longer confirmation probe too (see confirm_unresponsive).
+    probe_timeout: labelling budget per listener, must be > 0.
+    """
+    
+    # A zero/negative timeout would mark every listener Unresponsive (and killable)
+    if probe_timeout <= 0:
+        raise ValueError(f"probe_timeout must be > 0 seconds, got {probe_timeout}")
+    
+    # 1. Discovery (shared with any concurrent invocation)
+    servers = discover_servers()
+    
+    # Optional liveness probes (run per caller, they describe this exact moment)
+    probe = probe or unresponsive_only
+    if probe:
+        probe_servers(servers, probe_timeout)
+    
+    current_cwd = os.getcwd().lower()
+    
+    targets = []
+    results = [] # Detailed report
+    
+    for server in servers:
+        port = server['port']
+        protected = server['protected']
+        classification = server['type']
+        path = server['path']
+        conns = server['conns']
+        
+        # Extended Checks
+        scope_status = "Unknown"
+        if path:
+            path_lower = path.lower()
+            if path_lower.startswith(current_cwd):
+                scope_status = "Project"
+            elif "system32" in path_lower or "/usr/bin" in path_lower or "/sbin" in path_lower: # Heuristic
+                scope_status = "System"
+            else:
+                scope_status = "External"
+        
+        entry = dict(server, scope=scope_status)
         
         results.append(entry)
         
@@ -367,20 +934,38 @@ def server_slayer_tool(action: str, scope: str = "project", idle_only: bool = Fa
             if idle_only:
                 if conns > 0:
                     is_candidate = False
+            
+            # Unresponsive Filter
+            if unresponsive_only:
+                if server["health"] != "Unresponsive":
+                    is_candidate = False
         
         if is_candidate:
              targets.append(entry)
 
+    # The quick probe only labels; killing needs confirmed evidence
+    if action == "kill" and unresponsive_only and targets:
+        confirm_unresponsive(targets, max(CONFIRM_TIMEOUT, probe_timeout))
+        targets = [t for t in targets if t["kill_proof"]]
+
     # 2. Execution
     if action == "list" or action == "detect":
         # Format output as a nice markdown table
-        output = "| Port | PID | Type | Protected | Scope | Conns | Process |\n"
-        output += "|------|-----|------|-----------|-------|-------|---------|\n"
+        if probe:
+            output = "| Port | PID | Type | Protected | Scope | Conns | Health | Latency | Backlog | Process |\n"
+            output += "|------|-----|------|-----------|-------|-------|--------|---------|---------|---------|\n"
+        else:
+            output = "| Port | PID | Type | Protected | Scope | Conns | Process |\n"
+            output += "|------|-----|------|-----------|-------|-------|---------|\n"
         for r in results:
             prot_str = "YES" if r["protected"] else "No"
             # Truncate cmd
             cmd_short = (r["cmd"][:30] + '..') if len(r["cmd"]) > 30 else r["cmd"]
-            output += f"| {r['port']} | {r['pid']} | {r['type']} | {prot_str} | {r['scope']} | {r['conns']} | {cmd_short} |\n"
+            if probe:
+                latency_str = f"{r['latency_ms']}ms" if r.get("latency_ms") is not None else "-"
+                output += f"| {r['port']} | {r['pid']} | {r['type']} | {prot_str} | {r['scope']} | {r['conns']} | {r['health']} | {latency_str} | {r.get('backlog', '-')} | {cmd_short} |\n"
+            else:
+                output += f"| {r['port']} | {r['pid']} | {r['type']} | {prot_str} | {r['scope']} | {r['conns']} | {cmd_short} |\n"
         return output
         
     elif action == "kill":
@@ -390,19 +975,30 @@ def server_slayer_tool(action: str, scope: str = "project", idle_only: bool = Fa
         if not targets:
             return "No matching servers found to kill."
 
+        # Perform Kills (serialized per PID across concurrent runs)
+        outcomes = slay_processes([t["pid"] for t in targets if not t["protected"]], force)
+        
+        # One line per process: a PID may own several listeners (IPv4 + IPv6, app + HMR port)
+        by_pid = {}
         for t in targets:
             if t["protected"]:
                 # Should have been filtered, but double check
                 report.append(f"SKIPPED {t['port']} (Protected: {t['reason']})")
                 continue
-            
-            # Perform Kill
-            success = kill_process(t["pid"], force)
-            if success:
-                 report.append(f"⚔️ KILLED {t['port']} (PID {t['pid']}, {t['scope']}, {t['conns']} conns)")
+            by_pid.setdefault(t["pid"], []).append(t)
+        
+        for pid, rows in by_pid.items():
+            ports_str = ", ".join(str(r["port"]) for r in rows)
+            outcome = outcomes.get(pid, "failed")
+            if outcome == "killed":
+                 conns = sum(r["conns"] for r in rows)
+                 health_str = f", {'/'.join(sorted({r['health'] for r in rows}))}" if probe else ""
+                 report.append(f"⚔️ KILLED {ports_str} (PID {pid}, {rows[0]['scope']}, {conns} conns{health_str})")
                  killed_count += 1
+            elif outcome == "gone":
+                 report.append(f"💨 ALREADY GONE {ports_str} (PID {pid} exited before we got to it)")
             else:
-                 report.append(f"❌ FAILED {t['port']} (PID {t['pid']})")
+                 report.append(f"❌ FAILED {ports_str} (PID {pid})")
         
         # Add success message with star prompt
         if killed_count > 0:
@@ -423,7 +1019,14 @@ if __name__ == "__main__":
     parser.add_argument("--idle-only", action="store_true", help="Kill only idle servers")
     parser.add_argument("--force", action="store_true", help="Force kill")
     parser.add_argument("--port", type=int, help="Specific port to target")
+    parser.add_argument("--probe", action="store_true", help="Probe listeners and report Responsive/Slow/Unresponsive")
+    parser.add_argument("--unresponsive-only", action="store_true", help="Kill only servers that fail the liveness probe and a longer confirmation probe")
+    parser.add_argument("--probe-timeout", type=float, default=PROBE_TIMEOUT, help="Per-listener probe timeout in seconds (labels only)")
     
     args = parser.parse_args()
     
-    print(server_slayer_tool(args.action, args.scope, args.idle_only, args.force, args.port))
+    try:
+        print(server_slayer_tool(args.action, args.scope, args.idle_only, args.force, args.port,
+                                 args.probe, args.unresponsive_only, args.probe_timeout))
+    except ValueError as e:
+        parser.error(str(e))